@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.parse
+from typing import List, Dict, Tuple, Optional, Any
+from history import get_event_history, get_trends, SNAPSHOT_PATTERN
+
+MATCHES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "matches")
+RELOAD_INTERVAL = 60  # Seconds between checks for new snapshots when serving standalone
+SECTION_DETAIL_KEYS = ("sold_seats", "available_seats", "fill_rate", "largest_free_block", "largest_free_block_row",
+                       "row_stats", "item_types")
+
+
+class ApiCache:
+    """
+    In-memory store of the responses served by the API.
+    Each resource is serialized, hashed and gzipped once when the scraper updates it, so serving a request
+    is just a dictionary lookup no matter how many readers are polling.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, Any]] = {}
+        self._resources: Dict[str, Tuple[bytes, bytes, str, str]] = {"/events": self._encode({})}
+
+    def update_event(self, dir_path: str, category_totals: Dict[str, Any],
+                     sections: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Replaces the cached totals, history series, trends and section details for an event.
+        Parameters:
+            dir_path (str): The directory path where the event files are stored.
+            category_totals (Dict[str, Any]): The latest grouped totals for the event.
+            sections (Optional[List[Dict[str, Any]]]): The section results from get_ticket_info, if scraped this run.
+        """
+        slug = os.path.basename(dir_path.rstrip("/"))
+        history = get_event_history(dir_path)
+        series = {
+            category: [[taken_at.isoformat(), sold] for taken_at, sold in points]
+            for category, points in history.series.items()
+        }
+        trends = get_trends(dir_path)
+        section_details = None
+        if sections is not None:
+            section_details = {
+                section["section_name"]: {key: section[key] for key in SECTION_DETAIL_KEYS}
+                for section in sections if section
+            }
+
+        with self._lock:
+            self._totals[slug] = category_totals
+            self._resources[f"/events/{slug}"] = self._encode(category_totals)
+            self._resources[f"/events/{slug}/history"] = self._encode(series)
+            self._resources[f"/events/{slug}/trends"] = self._encode(trends)
+            if section_details is not None:
+                self._resources[f"/events/{slug}/sections"] = self._encode(section_details)
+            self._resources["/events"] = self._encode(self._totals)
+
+    def get(self, path: str) -> Optional[Tuple[bytes, bytes, str, str]]:
+        """Returns the (body, gzipped body, etag, gzip etag) for a path, or None if it isn't cached."""
+        with self._lock:
+            return self._resources.get(path.rstrip("/") or "/events")
+
+    @staticmethod
+    def _encode(data: Any) -> Tuple[bytes, bytes, str, str]:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        digest = hashlib.sha1(body).hexdigest()
+        # The two encodings are different byte sequences, so each gets its own strong ETag
+        return body, gzip.compress(body), f'"{digest}"', f'"{digest}-gzip"'
+
+
+api_cache = ApiCache()
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """Read-only handler serving JSON straight from the api_cache."""
+
+    def do_GET(self):
+        resource = api_cache.get(urllib.parse.unquote(self.path.split("?", 1)[0]))
+        if resource is None:
+            self.send_error(404, "Unknown event")
+            return
+
+        body, gzipped_body, identity_etag, gzip_etag = resource
+        use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        etag = gzip_etag if use_gzip else identity_etag
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+
+        payload = gzipped_body if use_gzip else body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Cache-Control", "no-cache")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # Keep the scraper output readable
+
+
+def update_event(dir_path: str, category_totals: Dict[str, Any],
+                 sections: Optional[List[Dict[str, Any]]] = None) -> None:
+    """Publishes the latest totals, and the section details if they were scraped, for an event to the API cache."""
+    api_cache.update_event(dir_path, category_totals, sections)
+
+
+_loaded_snapshots: Dict[str, str] = {}
+
+
+def load_from_disk(matches_path: str = MATCHES_PATH) -> int:
+    """
+    Updates the API cache with the latest snapshot of every event stored in the matches folder.
+    Events whose latest snapshot was already loaded are skipped, so this is cheap to call repeatedly.
+    Parameters:
+        matches_path (str): The folder containing one directory per event.
+    Returns:
+        int: The number of events that were updated.
+    """
+    if not os.path.isdir(matches_path):
+        return 0
+    updated = 0
+    for name in sorted(os.listdir(matches_path)):
+        dir_path = os.path.join(matches_path, name)
+        if name == "debug" or not os.path.isdir(dir_path):
+            continue
+        snapshots = sorted(filename for filename in os.listdir(dir_path) if SNAPSHOT_PATTERN.match(filename))
+        if not snapshots or _loaded_snapshots.get(dir_path) == snapshots[-1]:
+            continue
+        try:
+            with open(os.path.join(dir_path, snapshots[-1]), "r") as json_file:
+                update_event(dir_path, json.load(json_file))
+            _loaded_snapshots[dir_path] = snapshots[-1]
+            updated += 1
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Couldn't load {snapshots[-1]} for {name}: {e}")
+    return updated
+
+
+def watch_matches_folder(matches_path: str = MATCHES_PATH, interval: float = RELOAD_INTERVAL) -> None:
+    """
+    Keeps the API cache in step with the snapshots other scraper processes save, checking every interval.
+    Parameters:
+        matches_path (str): The folder containing one directory per event.
+        interval (float): Seconds to wait between checks.
+    """
+    while True:
+        time.sleep(interval)
+        updated = load_from_disk(matches_path)
+        if updated:
+            print(f"Loaded new snapshots for {updated} events")
+
+
+def start_api_server(host: str = "127.0.0.1", port: int = 8080, background: bool = True) -> ThreadingHTTPServer:
+    """
+    Starts the API server.
+    Parameters:
+        host (str): The interface to bind to.
+        port (int): The port to listen on.
+        background (bool): Serve on a daemon thread and return, or block and serve on the calling thread.
+    Returns:
+        ThreadingHTTPServer: The running server, so the caller can shut it down.
+    """
+    server = ThreadingHTTPServer((host, port), ApiRequestHandler)
+    print(f"API server listening on http://{host}:{port}/events")
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    else:
+        server.serve_forever()
+    return server
+
+
+if __name__ == "__main__":
+    load_from_disk()
+    start_api_server()
+    watch_matches_folder()
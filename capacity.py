@@ -0,0 +1,78 @@
+from typing import List, Dict, Tuple, Optional, Any
+from club_config import register_invalidator
+
+_capacity_cache: Dict[Tuple[str, str], int] = {}
+
+
+def clear_capacity_cache(config_path: str, old_model: Any = None, new_model: Any = None) -> None:
+    """Forgets the cached standing capacities of one club, e.g. after its capacity model has been changed."""
+    for event_key in [event_key for event_key in _capacity_cache if event_key[0] == config_path]:
+        del _capacity_cache[event_key]
+
+
+register_invalidator("capacity_model", clear_capacity_cache)
+
+
+def get_standing_sections(data: List[Dict[str, Any]], model: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Returns the standing sections that belong to the model's category.
+    A section must be flagged as standing by get_section_tickets and match one of the model's 'standing_sections'
+    patterns. Hidden sections are skipped unless TicketCo still reports an available amount for them.
+    """
+    patterns = [pattern.lower() for pattern in model.get("standing_sections", [])]
+    return [
+        section for section in data
+        if section and section.get("standing")
+        and any(pattern in section["section_name"].lower() for pattern in patterns)
+        and (section["visible"] or section.get("standing_available") is not None)
+    ]
+
+
+def get_standing_capacity(event_key: Tuple[str, str], standing_sections: List[Dict[str, Any]], model: Dict[str, Any],
+                          complete: bool) -> int:
+    """
+    Returns the standing capacity for an event, computed once and then cached.
+    Uses the section_amount reported by TicketCo and falls back to the stadium model if it reports nothing.
+    The capacity is only cached when every section was read, so a failed fetch doesn't stick for the whole event.
+    """
+    capacity = _capacity_cache.get(event_key)
+    if capacity is None:
+        capacity = sum(section["section_amount"] for section in standing_sections) or model["fallback_capacity"]
+        if complete:
+            _capacity_cache[event_key] = capacity
+    return capacity
+
+
+def estimate_standing(data: List[Dict[str, Any]], category_totals: Dict[str, Any], model: Dict[str, Any],
+                      event_key: Tuple[str, str], europa: bool) -> Optional[Dict[str, int]]:
+    """
+    Estimates the sales for the standing sections of an event, which don't have seats to count.
+    Sales are taken from the available amount TicketCo reports for the standing sections when there is one.
+    Otherwise the fill rate of the model's reference category is applied to the standing capacity.
+    Parameters:
+        data (List[Dict[str, Any]]): The section results from get_ticket_info.
+        category_totals (Dict[str, Any]): The seated totals per category.
+        model (Dict[str, Any]): The stadium's capacity model, with 'category', 'fallback_capacity'
+            and the 'standing_sections' name patterns.
+        event_key (Tuple[str, str]): The club's config path and the event title, keying the capacity cache.
+        europa (bool): European matches don't allow standing, so no estimate is made for them.
+    Returns:
+        Optional[Dict[str, int]]: Totals for the standing sections, or None if there is nothing to add.
+    """
+    if europa:
+        return None
+    standing_sections = get_standing_sections(data, model)
+    capacity = get_standing_capacity(event_key, standing_sections, model, all(section for section in data))
+
+    if standing_sections and all(section.get("standing_available") is not None for section in standing_sections):
+        available_seats = sum(section["standing_available"] for section in standing_sections)
+        sold_seats = max(capacity - available_seats, 0)
+    else:
+        reference = category_totals[model["category"]]
+        if reference["section_amount"] <= 0:
+            return None
+        percentage = round((reference["sold_seats"] / reference["section_amount"]), 2)
+        sold_seats = round(capacity * percentage)
+
+    return {"section_amount": capacity, "sold_seats": sold_seats,
+            "available_seats": capacity - sold_seats, "locked_seats": 0}
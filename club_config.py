@@ -0,0 +1,154 @@
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import List, Dict, Tuple, Callable, Any
+from event_time import parse_event_time
+
+REQUIRED_KEYS = {
+    "homepage_url": str,
+    "stadium": str,
+    "ignore_list": list,
+    "custom_games": list,
+    "categories": list,
+    "section_mapping": dict,
+    "exclusions": list,
+    "capacity_model": dict
+}
+SECTION_MATCH_MODES = ("substring", "regex")
+STRING_LIST_KEYS = ("ignore_list", "categories", "exclusions")
+
+_lock = threading.Lock()
+_configs: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_invalidators: Dict[str, List[Callable[[str, Any, Any], None]]] = {}
+
+
+def register_invalidator(key: str, callback: Callable[[str, Any, Any], None]) -> None:
+    """
+    Registers a callback that runs when a reloaded config changes the given key.
+    Caches tied to one part of the config use this so they are only cleared when that part changes.
+    Parameters:
+        key (str): The config key to watch, e.g. 'capacity_model'.
+        callback (Callable[[str, Any, Any], None]): Called with the config path, the old and the new value,
+            so only the entries belonging to that club are cleared.
+    """
+    _invalidators.setdefault(key, []).append(callback)
+
+
+def validate_config(config: Dict[str, Any]) -> None:
+    """
+    Checks that a club config has every required key with the right type and consistent contents.
+    Raises:
+        ValueError: If the config is invalid.
+    """
+    if not isinstance(config, dict):
+        raise ValueError("The config must be a JSON object")
+    for key, expected_type in REQUIRED_KEYS.items():
+        if not isinstance(config.get(key), expected_type):
+            raise ValueError(f"'{key}' is missing or isn't a {expected_type.__name__}")
+    for key in STRING_LIST_KEYS:
+        if not all(isinstance(value, str) for value in config[key]):
+            raise ValueError(f"Every entry in '{key}' must be a string")
+    if "TOTALT" in config["categories"]:
+        raise ValueError("'TOTALT' is added automatically and can't be a category")
+
+    section_match = config.get("section_match", "substring")
+    if section_match not in SECTION_MATCH_MODES:
+        raise ValueError(f"'section_match' must be one of {', '.join(SECTION_MATCH_MODES)}, not '{section_match}'")
+
+    categories = set(config["categories"])
+    for pattern, category in config["section_mapping"].items():
+        if not isinstance(category, str) or category not in categories:
+            raise ValueError(f"Section mapping '{pattern}' points to unknown category '{category}'")
+        if section_match == "regex":
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Section mapping '{pattern}' isn't a valid pattern: {e}")
+
+    if config["capacity_model"].get("category") not in categories:
+        raise ValueError("The capacity model must refer to one of the categories")
+    fallback_capacity = config["capacity_model"].get("fallback_capacity")
+    if not isinstance(fallback_capacity, int) or isinstance(fallback_capacity, bool) or fallback_capacity < 0:
+        raise ValueError("The capacity model needs a non-negative integer 'fallback_capacity'")
+    standing_sections = config["capacity_model"].get("standing_sections", [])
+    if not isinstance(standing_sections, list) or not all(isinstance(pattern, str) for pattern in standing_sections):
+        raise ValueError("The capacity model's 'standing_sections' must be a list of section name patterns")
+
+    for game in config["custom_games"]:
+        if not isinstance(game, dict):
+            raise ValueError(f"Custom game {game!r} must be an object with a title, time and link")
+        if not all(isinstance(game.get(key), str) for key in ("title", "time", "link")):
+            raise ValueError(f"Custom game {game} needs a title, time and link")
+        try:
+            parse_event_time(game["time"])
+        except ValueError as e:
+            raise ValueError(f"Custom game '{game['title']}' has an invalid time: {e}")
+
+
+def get_club_config(path: str) -> Dict[str, Any]:
+    """
+    Returns a club's config, reloading it if the file has changed since it was last read.
+    A reload only replaces the running config once the new file has been parsed and validated,
+    so a broken edit keeps the previous config in use. Callers should fetch the config once per run
+    and pass it along, so a single run never mixes two versions.
+    Parameters:
+        path (str): Path to the club's config.json.
+    Returns:
+        Dict[str, Any]: The current config.
+    Raises:
+        ValueError: If the config can't be loaded and there is no earlier version to fall back on.
+    """
+    try:
+        modified = os.path.getmtime(path)
+    except OSError as e:
+        modified = None
+        print(f"Couldn't check club config {path}: {e}")
+
+    with _lock:
+        cached = _configs.get(path)
+        if cached and (modified is None or cached[0] == modified):
+            return cached[1]
+
+        try:
+            with open(path, "r", encoding="utf-8") as config_file:
+                config = json.load(config_file)
+            validate_config(config)
+        except (OSError, ValueError, TypeError, AttributeError) as e:  # A malformed edit must never stop the poller
+            if cached is None:
+                raise ValueError(f"Couldn't load club config {path}: {e}")
+            print(f"Keeping previous club config, {path} is invalid: {e}")
+            _configs[path] = (modified, cached[1])  # Don't retry until the file changes again
+            return cached[1]
+
+        _configs[path] = (modified, config)
+
+    if cached:
+        print(f"Reloaded club config {path}")
+        for key, callbacks in _invalidators.items():
+            if cached[1].get(key) != config.get(key):
+                for callback in callbacks:
+                    callback(path, cached[1].get(key), config.get(key))
+    return config
+
+
+def get_section_patterns(config: Dict[str, Any]) -> List[Tuple[re.Pattern, str]]:
+    """
+    Returns the section mapping as compiled patterns paired with their category, in config order.
+    With 'section_match' set to 'substring' (the default) the keys are matched literally, with 'regex' as patterns.
+    Parameters:
+        config (Dict[str, Any]): A validated club config.
+    Returns:
+        List[Tuple[re.Pattern, str]]: The patterns to search the lowercased section names with.
+    """
+    return _compile_section_patterns(config.get("section_match", "substring"),
+                                     tuple(config["section_mapping"].items()))
+
+
+@lru_cache(maxsize=32)
+def _compile_section_patterns(section_match: str, mapping: Tuple[Tuple[str, str], ...]) -> List[Tuple[re.Pattern, str]]:
+    """Compiles each mapping only once, a reloaded config with the same mapping reuses the patterns."""
+    if section_match == "regex":
+        return [(re.compile(pattern), category) for pattern, category in mapping]
+    return [(re.compile(re.escape(pattern)), category) for pattern, category in mapping]
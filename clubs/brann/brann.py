@@ -1,41 +1,35 @@
+from datetime import datetime
 from image_creator import ImageCreator
 from scrape_tools import *
-from clubs.brann.brann_opponents import *
-from datetime import datetime
+from clubs.club_logos_mapping import *
+from event_time import parse_event_time
 from twitter import create_tweet
+import os
+from api_server import update_event
+from capacity import estimate_standing
+from club_config import get_club_config, get_section_patterns
 
-HOMEPAGE_URL = "https://brann.ticketco.events/no/nb"
 FILENAME = "brann"
-STADIUM = "Brann Stadion"
-IGNORE_LIST = {
-    "partoutkort",
-    "sesongkort",
-    "gavekort",
-    "em"
-}
-CUSTOM_GAMES = [{'title': 'Brann - FC Astana, Conference League',
-                 'time': '22.08.2024 19:00\n@\nBrann Stadion',
-                 'link': 'https://brann.ticketco.events/no/nb/events/664905/seating_arrangement/'}]
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
 
 
 def custom_event_filter(e_list):
     filtered_list = []
-    sorted_events = sorted(e_list, key=lambda x: datetime.strptime(x['time'].split(' ', 1)[0], "%d.%m.%Y"))
+    sorted_events = sorted(e_list, key=lambda x: parse_event_time(x['time'])[0])
 
     for e in sorted_events:
-        updated_time = e['time'].replace("\n@\n", " @ ")
+        kickoff, venue = parse_event_time(e['time'])
         europe = get_europe_from_event_title(e['title'])
-        venue = updated_time.split(' @ ', 1)[1]
-        date = datetime.strptime(updated_time.split(' ', 1)[0], "%d.%m.%Y").date().strftime("%d.%m.%y")
-        time = updated_time.split(' ', 2)[1]
 
         updated_event = {
             'title': e['title'],
-            'time': time,
-            'date': date,
+            'time': kickoff.strftime("%H:%M"),
+            'date': kickoff.strftime("%d.%m.%y"),
             'venue': venue,
+            'kickoff': kickoff,
             'link': e['link'],
-            'europe': europe
+            'europe': europe,
+            'assets': resolve_event(e['title'].lower())
         }
         filtered_list.append(updated_event)
     return filtered_list
@@ -47,27 +41,21 @@ def update_totals(category, section, category_totals):
     category_totals[category]["available_seats"] += section["available_seats"]
     category_totals[category]["locked_seats"] += section["locked_seats"]
 
+    # Keep the longest run of free seats next to each other in the category
+    free_block = section.get("largest_free_block", 0)
+    if free_block > category_totals[category]["largest_free_block"]["seats"]:
+        category_totals[category]["largest_free_block"] = {
+            "section": section["section_name"], "row": section["largest_free_block_row"], "seats": free_block
+        }
 
-def brann_stadion(data, event_title: str, event_date: str, europa: bool) -> Dict:
+
+def brann_stadion(data, event_title: str, event_date: str, kickoff: datetime, europa: bool, config: Dict) -> Dict:
     time_now = get_time_formatted("human")
-    category_totals = {
-        "GENERAL": {"title": event_title, "date": event_date, "time": time_now},
-        "FRYDENBØ": {"section_amount": 0, "sold_seats": 0, "available_seats": 0, "locked_seats": 0},
-        "SPV": {"section_amount": 0, "sold_seats": 0, "available_seats": 0, "locked_seats": 0},
-        "BT": {"section_amount": 0, "sold_seats": 0, "available_seats": 0, "locked_seats": 0},
-        "FJORDKRAFT": {"section_amount": 0, "sold_seats": 0, "available_seats": 0, "locked_seats": 0},
-        "VIP": {"section_amount": 0, "sold_seats": 0, "available_seats": 0, "locked_seats": 0},
-        "TOTALT": {"section_amount": 0, "sold_seats": 0, "available_seats": 0, "locked_seats": 0}
-    }
-
-    section_category_mapping = {
-        "spv": "SPV",
-        "bob": "BT",
-        "bt": "BT",
-        "frydenbø": "FRYDENBØ",
-        "fjordkraft": "FJORDKRAFT",
-        "vip": "VIP"
-    }
+    category_totals = {"GENERAL": {"title": event_title, "date": event_date, "kickoff": kickoff.isoformat(),
+                                   "time": time_now}}
+    for category in config["categories"] + ["TOTALT"]:
+        category_totals[category] = {"section_amount": 0, "sold_seats": 0, "available_seats": 0, "locked_seats": 0,
+                                     "largest_free_block": {"section": None, "row": None, "seats": 0}}
 
     for section in data:
         section_name = section["section_name"].lower()
@@ -79,39 +67,38 @@ def brann_stadion(data, event_title: str, event_date: str, europa: bool) -> Dict
             continue
 
         # General exclusions applicable to all categories, spesific for 'Brann Stadion'
-        if any(exclusion in section_name for exclusion in ["press", "gangen", "stå",
-                                                           "fjordkraft felt a", "fjordkraft felt b"]):
+        if any(exclusion in section_name for exclusion in config["exclusions"]):
             continue
 
-        for key, category in section_category_mapping.items():
-            if key in section_name:
+        for pattern, category in get_section_patterns(config):
+            if pattern.search(section_name):
                 update_totals(category, section, category_totals)
                 update_totals("TOTALT", section, category_totals)
                 break  # Break if we've found a matching category to avoid double counting
 
-    if not europa and category_totals["FRYDENBØ"]["section_amount"] > 0:
-        percentage = round((category_totals["FRYDENBØ"]["sold_seats"] / category_totals["FRYDENBØ"]["section_amount"]), 2)
-        sold_seats = round(1000 * percentage)
-        category_totals["FRYDENBØ"]["sold_seats"] += sold_seats
-        category_totals["FRYDENBØ"]["section_amount"] += 1000
-        category_totals["FRYDENBØ"]["available_seats"] += 1000 - sold_seats
-        update_totals("TOTALT", {"section_amount": 1000, "sold_seats": sold_seats,
-                                 "available_seats": 1000 - sold_seats, "locked_seats": 0}, category_totals)
+    capacity_model = config["capacity_model"]
+    standing = estimate_standing(data, category_totals, capacity_model, (CONFIG_PATH, event_title), europa)
+    if standing:
+        update_totals(capacity_model["category"], standing, category_totals)
+        update_totals("TOTALT", standing, category_totals)
     return category_totals
 
 
-def run_brann(option: str, use_local_data: bool, debug: bool):
+def run_brann(option: str, use_local_data: bool, debug: bool, dry_run: bool = False):
     print(f"Starting fetching data for {FILENAME}... ")
-    temp_event_list = get_upcoming_events(option, HOMEPAGE_URL, IGNORE_LIST)
-    event_list = add_custom_games(CUSTOM_GAMES, temp_event_list)
+    config = get_club_config(CONFIG_PATH)  # One config for the whole run, even if the file changes meanwhile
+    temp_event_list = get_upcoming_events(option, config["homepage_url"], set(config["ignore_list"]))
+    event_list = add_custom_games(config["custom_games"], temp_event_list)
 
     filtered_event_list = custom_event_filter(event_list)
     pic_number = 0
     image_path_list = []
+    event_paths = []
 
     for event in filtered_event_list:
         event_title = event["title"]
-        if event['venue'] == STADIUM:
+        if event['venue'] == config["stadium"]:
+            scraped = None
             if use_local_data:
                 path, path_simple = get_directory_path(event["title"])  # Function to get path of local data
                 print(f"\nFetched local data from {path_simple}")
@@ -124,22 +111,32 @@ def run_brann(option: str, use_local_data: bool, debug: bool):
                     continue
                 else:
                     date_time_venue = f'{event["date"]} {event["time"]} @ {event["venue"]}'
-                    grouped_results = brann_stadion(results, event["title"], date_time_venue, event["europe"])
+                    grouped_results = brann_stadion(results, event["title"], date_time_venue, event["kickoff"],
+                                                    event["europe"], config)
                     path = save_new_json(event["title"], grouped_results)
-
-            # Prepare text for image creation
-            background_path, league, image_map = get_league_and_background(event_title.lower())
-            image_creator = ImageCreator(f"images/{background_path}", f"images/{FILENAME}.png", "Brann")
-            image_text = create_string(path)
-            final_image = image_creator.create_image(image_text, image_map, league)
-            if final_image:
-                image_path = f"clubs/{FILENAME}/picture{pic_number}.png"
-                image_path_list.append(image_creator.save_image(final_image, image_path))
-                pic_number = pic_number + 1
+                    scraped = (grouped_results, results)
+            event_paths.append((event, path, scraped))
         else:
             print(f"Error: Unknown stadium for {event_title}")
 
-    if image_path_list.__len__() > 0:
+    flush_snapshots()  # One batched sync for every event in this run
+
+    for event, path, scraped in event_paths:
+        if scraped:
+            update_event(path, *scraped)  # Published once the snapshot is safely on disk
+        # Prepare text for image creation
+        assets = event["assets"]
+        image_creator = ImageCreator(f"images/{assets['background']}", f"images/{FILENAME}.png", "Brann")
+        image_text = create_string(path, include_forecast=True)
+        final_image = image_creator.create_image(image_text, assets["image_map"], assets["league"], assets["opponent"])
+        if final_image:
+            image_path = get_image_path(FILENAME, pic_number)
+            image_path_list.append(image_creator.save_image(final_image, image_path))
+            pic_number = pic_number + 1
+
+    if dry_run:
+        print(f"Dry run: skipping tweet with {len(image_path_list)} images")
+    elif image_path_list.__len__() > 0:
         tweet_header = ("Info om billettsalget for Brann sine kommende hjemmekamper!"
                         "\nTallene er ikke offisielle og kan variere fra reelle tall.")
         create_tweet(tweet_header, image_path_list)
@@ -1,3 +1,7 @@
+from functools import lru_cache
+from typing import List, Dict, Tuple, Optional, Any
+from clubs.keyword_matcher import KeywordMatcher
+
 # ("keyword"): ("image_name", "title"),
 IMAGE_MAP_ELITESERIEN = {
     ("aalesund", "ålesund"): ("alesund.png", "Aalesund"),
@@ -19,29 +23,100 @@ IMAGE_MAP_ELITESERIEN = {
     ("tromsø",): ("tromso.png", "Tromsø"),
     ("vålerenga",): ("valrenga.png", "Vålerenga"),
     ("viking",): ("viking.png", "Viking"),
+    ("partoutkort eliteserien",): ("eliteserien_logo.png", "\nPartoutkort Eliteserien 2024"),
 }
 
 IMAGE_MAP_TOPPSERIEN = {
-    ("arna", "bjørnar", "bjornar"): ("arnabjornar.png", "Brann - Arna-Bjørnar"),
-    ("kolbotn",): ("kolbotn.png", "Brann - Kolbotn"),
-    ("kristiansund",): ("kristiansund.png", "Brann - Kristiansund"),
-    ("lillestrøm", "lsk"): ("lskkvinner.png", "Brann - LSK Kvinner"),
-    ("lyn",): ("lyn.png", "Brann - Lyn"),
-    ("rosenborg",): ("rbkkvinner.png", "Brann - Rosenborg"),
-    ("roa", "røa"): ("roa.png", "Brann - Røa"),
-    ("stabæk",): ("stabek.png", "Brann - Stabæk"),
-    ("vålerenga",): ("valrenga.png", "Brann - Vålerenga"),
-    ("åsane", "aasane", "asane"): ("aasane.png", "Brann - Åsane"),
+    ("arna", "bjørnar", "bjornar"): ("arnabjornar.png", "Arna-Bjørnar"),
+    ("kolbotn",): ("kolbotn.png", "Kolbotn"),
+    ("kristiansund",): ("kristiansund.png", "Kristiansund"),
+    ("lillestrøm", "lsk"): ("lskkvinner.png", "LSK Kvinner"),
+    ("lyn",): ("lyn.png", "Lyn"),
+    ("rosenborg",): ("rbkkvinner.png", "Rosenborg"),
+    ("roa", "røa"): ("roa.png", "Røa"),
+    ("stabæk",): ("stabek.png", "Stabæk"),
+    ("vålerenga",): ("valrenga.png", "Vålerenga"),
+    ("åsane", "aasane", "asane"): ("aasane.png", "Åsane"),
+    ("partoutkort toppserien",): ("toppserien_logo.png", "\nPartoutkort Toppserien 2024"),
+}
+
+IMAGE_MAP = {
+    ("alkmaar",): ("alkmaar.png", "AZ Alkmaar"),
+    ("glasgow",): ("default.png", "Glasgow City"),
+    ("praha",): ("default.png", "Slavia Praha"),
+    ("lyon",): ("lyon.png", "Lyon"),
+    ("pölten",): ("polten.png", "St. Pölten"),
+    ("barcelona",): ("barcelona_femini.png", "Barcelona"),
+    ("go ahead eagles", "gae",): ("gae.png", "Go Ahead Eagles"),
+    ("mirren",): ("stmirren.png", "St. Mirren"),
+    ("astana",): ("astana.png", "FC Astana")
+}
+
+# ("keyword"): ("background", "league", image_map), checked in order
+LEAGUE_MAP = {
+    ("eliteserien",): ("brann_herrer_bg.png", "Eliteserien", IMAGE_MAP_ELITESERIEN),
+    ("toppserien",): ("brann_kvinner_bg.png", "Toppserien", IMAGE_MAP_TOPPSERIEN),
+    # Må finne en måte å skille mellom cup for herrer og kvinner
+    ("cup", "nm"): ("brann_cup_bg.png", "NM", IMAGE_MAP_ELITESERIEN),
+    ("champion",): ("brann_champ_bg.png", "Champions League", IMAGE_MAP),
+    ("europa",): ("brann_europa_bg.png", "Europa League", IMAGE_MAP),
+    ("conference",): ("brann_conf_bg.png", "Conference League", IMAGE_MAP),
 }
+DEFAULT_LEAGUE = ("brann_bg.png", "Error", None)
+
+_matchers: Dict[int, Tuple[Dict, KeywordMatcher, List[Any]]] = {}
+
+
+def get_matcher(keyword_map: Dict) -> Tuple[KeywordMatcher, List[Any]]:
+    """Returns the prebuilt matcher and values for a keyword map, building them the first time the map is used."""
+    cached = _matchers.get(id(keyword_map))
+    if cached is None or cached[0] is not keyword_map:
+        matcher = KeywordMatcher((keyword, priority)
+                                 for priority, keywords in enumerate(keyword_map)
+                                 for keyword in keywords)
+        cached = _matchers[id(keyword_map)] = (keyword_map, matcher, list(keyword_map.values()))
+    return cached[1], cached[2]
+
+
+def find_in_map(text: str, keyword_map: Optional[Dict]) -> Optional[Any]:
+    """Returns the value of the first entry in the map with a keyword found in the text, or None."""
+    if not keyword_map:
+        return None
+    matcher, values = get_matcher(keyword_map)
+    matches = matcher.find_all(text.lower())
+    if not matches:
+        return None
+    return values[min(matches)]
+
+
+def find_opponent(opponent: str, image_map: Optional[Dict]) -> Tuple[Optional[str], Optional[str]]:
+    """Returns the (logo, name) of the opponent mentioned in the text, or (None, None) if it isn't known."""
+    return find_in_map(opponent, image_map) or (None, None)
+
+
+def find_opponent_in_title(title: str, image_map: Optional[Dict]) -> Tuple[Optional[str], Optional[str]]:
+    """Returns the (logo, name) of the away team in a 'Home - Away, League' title."""
+    opponent = title.split('-')[1] if '-' in title else title
+    return find_opponent(opponent, image_map)
 
 
 def get_league_and_background(title):
-    if "eliteserien"in title:
-        return "brann_herrer_bg.png", "Eliteserien", IMAGE_MAP_ELITESERIEN
-    elif "toppserien"in title:
-        return "brann_kvinner_bg.png", "Toppserien", IMAGE_MAP_TOPPSERIEN
-    elif "cup"in title or "nm"in title:
-        # Må finne en måte å skille mellom cup for herrer og kvinner
-        return "brann_cup_bg.png", "NM", IMAGE_MAP_ELITESERIEN
-    else:
-        return
+    return find_in_map(title, LEAGUE_MAP) or DEFAULT_LEAGUE
+
+
+@lru_cache(maxsize=None)
+def resolve_event(title: str) -> Dict[str, Any]:
+    """
+    Resolves the background, league and opponent for an event title once, so rendering doesn't repeat the lookups.
+    Parameters:
+        title (str): The event title, e.g. 'Brann - Viking, Eliteserien'.
+    Returns:
+        Dict[str, Any]: The background, league, image_map and opponent as a (logo, name) tuple.
+    """
+    background, league, image_map = get_league_and_background(title)
+    return {
+        "background": background,
+        "league": league,
+        "image_map": image_map,
+        "opponent": find_opponent_in_title(title, image_map)
+    }
@@ -0,0 +1,49 @@
+from datetime import datetime
+from functools import lru_cache
+import pytz
+from typing import Tuple
+
+DEFAULT_TIMEZONE = "Europe/Oslo"
+EVENT_TIME_FORMAT = "%d.%m.%Y %H:%M"
+
+
+@lru_cache(maxsize=None)
+def get_timezone(name: str = DEFAULT_TIMEZONE) -> pytz.BaseTzInfo:
+    """Returns the timezone object for the name, loading it only once."""
+    return pytz.timezone(name)
+
+
+def now() -> datetime:
+    """Returns the current time as an aware datetime in Norwegian time."""
+    return datetime.now(get_timezone())
+
+
+def localize(naive_datetime: datetime) -> datetime:
+    """Attaches Norwegian time to a naive datetime, taking daylight saving time into account."""
+    return get_timezone().localize(naive_datetime)
+
+
+def normalize(aware_datetime: datetime) -> datetime:
+    """Fixes the UTC offset after datetime arithmetic that crosses a daylight saving time change."""
+    return get_timezone().normalize(aware_datetime)
+
+
+def parse_iso_time(value: str) -> datetime:
+    """Parses an ISO 8601 timestamp stored by the scraper back into an aware datetime in Norwegian time."""
+    return datetime.fromisoformat(value).astimezone(get_timezone())
+
+
+@lru_cache(maxsize=1024)
+def parse_event_time(raw_time: str) -> Tuple[datetime, str]:
+    """
+    Parses the time string scraped from TicketCo into an aware kickoff and the venue.
+    Each distinct string is parsed once; every later stage gets the cached result.
+    Parameters:
+        raw_time (str): The event time, e.g. '22.08.2024 19:00\\n@\\nBrann Stadion'.
+    Returns:
+        Tuple[datetime, str]: The kickoff in Norwegian time and the venue.
+    """
+    date_time, _, venue = raw_time.replace("\n@\n", " @ ").partition(" @ ")
+    date, time = date_time.split(' ')[:2]
+    kickoff = localize(datetime.strptime(f"{date} {time}", EVENT_TIME_FORMAT))
+    return kickoff, venue.strip()
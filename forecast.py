@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+import numpy as np
+from typing import List, Dict, Optional, Any
+from history import EventHistory, get_event_history
+from event_time import normalize
+
+MIN_SNAPSHOTS = 3
+
+
+class SalesForecaster:
+    """
+    Fits a linear sales curve (sold seats over hours) per category with least squares.
+    The fit is kept as running sums per category, so each poll only adds the new snapshots
+    instead of refitting the whole history. If a snapshot is inserted before ones already consumed,
+    that category is refitted from scratch.
+    """
+
+    def __init__(self):
+        self.categories: List[str] = []
+        self.origin: Optional[datetime] = None
+        # Columns: n, sum(t), sum(t^2), sum(y), sum(t*y)
+        self.sums = np.zeros((0, 5))
+        self.latest_sold = np.zeros(0)
+        self.latest_hours = np.zeros(0)
+        self._consumed: Dict[str, int] = {}
+        self._last_consumed: Dict[str, datetime] = {}
+
+    def update(self, history: EventHistory) -> None:
+        """
+        Adds the snapshots that have appeared in the history since the last update.
+        Parameters:
+            history (EventHistory): The event history to learn from.
+        """
+        category_index, hours, sold = [], [], []
+        for category, points in history.series.items():
+            if category not in self._consumed:
+                self._consumed[category] = 0
+                self.categories.append(category)
+                self.sums = np.vstack([self.sums, np.zeros(5)])
+                self.latest_sold = np.append(self.latest_sold, 0)
+                self.latest_hours = np.append(self.latest_hours, 0)
+            index = self.categories.index(category)
+            consumed = self._consumed[category]
+            if consumed and points[consumed - 1][0] != self._last_consumed[category]:
+                # A snapshot arrived out of order and was sorted in among the consumed ones
+                self.sums[index] = 0
+                consumed = 0
+            new_points = points[consumed:]
+            if not new_points:
+                continue
+            if self.origin is None:
+                self.origin = new_points[0][0]
+            category_index.extend([index] * len(new_points))
+            hours.extend((taken_at - self.origin).total_seconds() / 3600 for taken_at, _ in new_points)
+            sold.extend(sold_seats for _, sold_seats in new_points)
+            self.latest_sold[index] = new_points[-1][1]
+            self.latest_hours[index] = hours[-1]
+            self._consumed[category] = len(points)
+            self._last_consumed[category] = points[-1][0]
+
+        if not category_index:
+            return
+        index = np.asarray(category_index)
+        t = np.asarray(hours)
+        y = np.asarray(sold, dtype=float)
+        size = len(self.categories)
+        for column, weights in enumerate((None, t, t * t, y, t * y)):
+            self.sums[:, column] += np.bincount(index, weights=weights, minlength=size)
+
+    def predict(self, kickoff: datetime, capacity: Dict[str, int]) -> Dict[str, Dict[str, Any]]:
+        """
+        Predicts the final attendance and sellout time for every category.
+        Parameters:
+            kickoff (datetime): When the event starts.
+            capacity (Dict[str, int]): The latest known capacity per category.
+        Returns:
+            Dict[str, Dict[str, Any]]: Per category the predicted sold seats, capacity and sellout time (or None).
+        """
+        if self.origin is None:
+            return {}
+
+        n, st, stt, sy, sty = self.sums.T
+        denominator = n * stt - st * st
+        valid = (n >= MIN_SNAPSHOTS) & (denominator > 0)
+        safe_denominator = np.where(valid, denominator, 1)
+        slope = np.where(valid, (n * sty - st * sy) / safe_denominator, 0)
+        intercept = np.where(valid, (sy - slope * st) / np.maximum(n, 1), 0)
+
+        kickoff_hours = (kickoff - self.origin).total_seconds() / 3600
+        seats = np.array([capacity.get(category, 0) for category in self.categories], dtype=float)
+        predicted = np.clip(intercept + slope * kickoff_hours, self.latest_sold, seats)
+        safe_slope = np.where(slope > 0, slope, 1)
+        sellout_hours = np.where(slope > 0, np.maximum((seats - intercept) / safe_slope, self.latest_hours), np.inf)
+
+        forecasts = {}
+        for index in np.flatnonzero(valid):
+            sellout = None
+            if self.latest_sold[index] >= seats[index] > 0:
+                sellout = normalize(self.origin + timedelta(hours=float(self.latest_hours[index])))  # Already sold out
+            elif sellout_hours[index] <= kickoff_hours:
+                sellout = normalize(self.origin + timedelta(hours=float(sellout_hours[index])))
+            forecasts[self.categories[index]] = {
+                "predicted_sold": int(round(predicted[index])),
+                "section_amount": int(seats[index]),
+                "sellout": sellout
+            }
+        return forecasts
+
+
+_forecaster_cache: Dict[str, SalesForecaster] = {}
+
+
+def get_forecast(dir_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the sales forecast for an event, updating its cached model with any new snapshots first.
+    Parameters:
+        dir_path (str): The directory path where the event files are stored.
+    Returns:
+        Dict[str, Dict[str, Any]]: The forecast per category, or an empty dict if there isn't enough data.
+    """
+    history = get_event_history(dir_path)
+    if history.kickoff is None:
+        return {}
+
+    forecaster = _forecaster_cache.get(dir_path)
+    if forecaster is None:
+        forecaster = _forecaster_cache[dir_path] = SalesForecaster()
+    forecaster.update(history)
+    return forecaster.predict(history.kickoff, history.capacity)
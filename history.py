@@ -0,0 +1,284 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+import json
+import os
+import re
+from typing import List, Dict, Tuple, Optional, Any
+from event_time import localize, normalize, parse_iso_time
+
+SNAPSHOT_PATTERN = re.compile(r"^results_(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\.json$")
+SNAPSHOT_TIME_FORMAT = "%Y-%m-%d_%H-%M-%S"
+KICKOFF_TIME_FORMAT = "%d.%m.%y %H:%M"
+
+
+class EventHistory:
+    """
+    Sold-seat time series for a single event, built incrementally from the snapshot files in its directory.
+    Every snapshot is parsed exactly once; later calls to refresh() only read files that have appeared since.
+    The velocity, projected sellout and comparison with earlier matches are updated once per batch of new snapshots.
+    """
+
+    def __init__(self, dir_path: str):
+        self.dir_path = dir_path
+        self.parent = os.path.dirname(dir_path.rstrip("/"))
+        self.title: Optional[str] = None
+        self.kickoff: Optional[datetime] = None
+        self.series: Dict[str, List[Tuple[datetime, int]]] = {}
+        self.capacity: Dict[str, int] = {}
+        self.trends: Dict[str, Dict[str, Any]] = {}
+        self.previous_matches: List[Dict[str, Any]] = []
+        self._seen_files = set()
+
+    def refresh(self, compare: bool = True) -> "EventHistory":
+        """
+        Reads any snapshot files that have not been processed yet and updates the trends once for the batch.
+        Parameters:
+            compare (bool): Also redo the comparison with earlier matches. load_folder turns this off
+                and compares once every event in the folder has been read.
+        """
+        if not os.path.isdir(self.dir_path):
+            return self
+
+        new_files = []
+        for filename in os.listdir(self.dir_path):
+            match = SNAPSHOT_PATTERN.match(filename)
+            if match and filename not in self._seen_files:
+                new_files.append((match.group(1), filename))
+
+        for timestamp, filename in sorted(new_files):
+            self._seen_files.add(filename)
+            try:
+                with open(os.path.join(self.dir_path, filename), "r") as json_file:
+                    data = json.load(json_file)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Skipping unreadable snapshot {filename}: {e}")
+                continue
+            self.add_snapshot(parse_snapshot_time(timestamp), data, update=False)
+
+        if new_files:
+            self.update_trends()
+            if compare:
+                self.update_previous_matches()
+        return self
+
+    def add_snapshot(self, taken_at: datetime, data: Any, update: bool = True) -> None:
+        """
+        Appends one snapshot to the series of every category it contains.
+        Parameters:
+            taken_at (datetime): When the snapshot was taken.
+            data (Any): The grouped category totals as saved by save_new_json.
+            update (bool): Update the trends right away. refresh() turns this off and updates once per batch.
+        """
+        if not isinstance(data, dict):
+            return  # Debug dumps are raw section lists, not category totals
+
+        for category, values in data.items():
+            if "GENERAL" in category:
+                self.title = values.get("title", self.title)
+                self.kickoff = parse_kickoff(values) or self.kickoff
+                continue
+
+            section_amount = values.get("section_amount", 0)
+            sold_seats = section_amount - values.get("available_seats", 0)
+            points = self.series.setdefault(category, [])
+            points.append((taken_at, sold_seats))
+            if len(points) > 1 and points[-2][0] > taken_at:
+                points.sort(key=lambda point: point[0])
+            self.capacity[category] = section_amount
+        if update:
+            self.update_trends()
+            self.update_previous_matches()
+
+    def update_trends(self) -> None:
+        """Recalculates the velocity and projected sellout of every category from its latest snapshots."""
+        self.trends = {
+            category: {
+                "velocity": self.get_velocity(category),
+                "projected_sellout": self.get_projected_sellout(category)
+            }
+            for category in self.series
+        }
+
+    def update_previous_matches(self, category: str = "TOTALT") -> None:
+        """
+        Compares the sales with the earlier matches already loaded from the same folder,
+        at the same number of days before kickoff.
+        """
+        days_before = self.get_days_before_kickoff()
+        if days_before is None:
+            self.previous_matches = []
+            return
+
+        comparisons = []
+        for other in _history_cache.values():
+            if other is self or other.parent != self.parent or other.kickoff is None or other.kickoff >= self.kickoff:
+                continue
+            sold_seats = other.get_sold_at_days_before(category, days_before)
+            if sold_seats is None:
+                continue
+            comparisons.append({
+                "title": other.title,
+                "kickoff": other.kickoff,
+                "sold_seats": sold_seats,
+                "section_amount": other.capacity.get(category, 0)
+            })
+        self.previous_matches = sorted(comparisons, key=lambda x: x["kickoff"])
+
+    def get_series(self, category: str) -> List[Tuple[datetime, int]]:
+        """Returns the (timestamp, sold seats) series for a category, oldest first."""
+        return self.series.get(category, [])
+
+    def get_velocity(self, category: str, window: timedelta = timedelta(hours=24)) -> Optional[float]:
+        """
+        Calculates the sales velocity for a category in seats per hour.
+        Parameters:
+            category (str): The category to look at, e.g. 'TOTALT'.
+            window (timedelta): How far back from the latest snapshot to measure.
+        Returns:
+            Optional[float]: Seats sold per hour, or None if there are fewer than two snapshots.
+        """
+        points = self.get_series(category)
+        if len(points) < 2:
+            return None
+
+        latest_time, latest_sold = points[-1]
+        # The series is sorted by time, so the first snapshot inside the window can be found by bisection
+        start_time, start_sold = points[bisect_left(points, (latest_time - window, float("-inf")))]
+        if start_time == latest_time:
+            start_time, start_sold = points[-2]
+
+        hours = (latest_time - start_time).total_seconds() / 3600
+        return (latest_sold - start_sold) / hours if hours > 0 else None
+
+    def get_projected_sellout(self, category: str, window: timedelta = timedelta(hours=24)) -> Optional[datetime]:
+        """
+        Projects when a category sells out if the current velocity holds.
+        Returns:
+            Optional[datetime]: The projected sellout time, or None if sales are flat or the data is insufficient.
+        """
+        points = self.get_series(category)
+        velocity = self.get_velocity(category, window)
+        if not points or not velocity or velocity <= 0:
+            return None
+
+        latest_time, latest_sold = points[-1]
+        remaining = self.capacity.get(category, 0) - latest_sold
+        if remaining <= 0:
+            return latest_time
+        return normalize(latest_time + timedelta(hours=remaining / velocity))
+
+    def get_sold_at_days_before(self, category: str, days_before: float) -> Optional[int]:
+        """
+        Returns the sold seats from the last snapshot taken at least the given number of days before kickoff.
+        """
+        if self.kickoff is None:
+            return None
+        points = self.get_series(category)
+        index = bisect_right(points, (self.kickoff - timedelta(days=days_before), float("inf")))
+        return points[index - 1][1] if index else None
+
+    def get_days_before_kickoff(self, at: Optional[datetime] = None) -> Optional[float]:
+        """Returns how many days remain until kickoff, measured from 'at' or the latest snapshot."""
+        if self.kickoff is None:
+            return None
+        if at is None:
+            latest = max((points[-1][0] for points in self.series.values() if points), default=None)
+            if latest is None:
+                return None
+            at = latest
+        return (self.kickoff - at).total_seconds() / 86400
+
+
+_history_cache: Dict[str, EventHistory] = {}
+_loaded_folders = set()
+
+
+def parse_kickoff(general: Dict[str, Any]) -> Optional[datetime]:
+    """
+    Returns the kickoff stored in a snapshot's GENERAL entry.
+    Snapshots saved before the ISO 'kickoff' field was added only have it in the 'date' field,
+    formatted as 'dd.mm.yy HH:MM @ venue'.
+    """
+    try:
+        if "kickoff" in general:
+            return parse_iso_time(general["kickoff"])
+        return localize(datetime.strptime(general.get("date", "").split(" @ ", 1)[0].strip(), KICKOFF_TIME_FORMAT))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_snapshot_time(timestamp: str) -> datetime:
+    """Parses the timestamp from a snapshot filename, which is written in Norwegian time."""
+    return localize(datetime.strptime(timestamp, SNAPSHOT_TIME_FORMAT))
+
+
+def get_event_history(dir_path: str) -> EventHistory:
+    """
+    Returns the cached history for an event directory, reading only snapshots added since the last call.
+    The first call for a folder also loads the other events in it, so they can be compared without rescanning.
+    Parameters:
+        dir_path (str): The directory path where the event files are stored.
+    Returns:
+        EventHistory: The up-to-date history for the event.
+    """
+    history = _history_cache.get(dir_path)
+    if history is None:
+        history = _history_cache[dir_path] = EventHistory(dir_path)
+        load_folder(history.parent)
+    return history.refresh()
+
+
+def load_folder(matches_path: str) -> None:
+    """Loads the history of every event directory below the matches folder, once per folder."""
+    if matches_path in _loaded_folders or not os.path.isdir(matches_path):
+        return
+    _loaded_folders.add(matches_path)
+
+    histories = []
+    for name in sorted(os.listdir(matches_path)):
+        dir_path = os.path.join(matches_path, name)
+        if name != "debug" and os.path.isdir(dir_path):
+            if dir_path not in _history_cache:
+                _history_cache[dir_path] = EventHistory(dir_path)
+            histories.append(_history_cache[dir_path].refresh(compare=False))
+    for history in histories:
+        history.update_previous_matches()  # Every event is loaded now, so the comparisons are complete
+
+
+def record_snapshot(dir_path: str, filename: str, data: Any) -> None:
+    """
+    Feeds a snapshot that has just been moved into place straight into the cached history,
+    so it doesn't have to be read back from disk.
+    """
+    match = SNAPSHOT_PATTERN.match(filename)
+    if not match:
+        return
+    history = get_event_history(dir_path)
+    if filename in history._seen_files:
+        return
+    history._seen_files.add(filename)
+    history.add_snapshot(parse_snapshot_time(match.group(1)), data)
+
+
+def get_trends(dir_path: str) -> Dict[str, Any]:
+    """
+    Returns the precomputed trends for an event in a JSON friendly form.
+    Parameters:
+        dir_path (str): The directory path of the event.
+    Returns:
+        Dict[str, Any]: Velocity and projected sellout per category, days before kickoff and earlier matches.
+    """
+    history = get_event_history(dir_path)
+    return {
+        "days_before_kickoff": history.get_days_before_kickoff(),
+        "categories": {
+            category: {
+                "velocity": trend["velocity"],
+                "projected_sellout": trend["projected_sellout"].isoformat() if trend["projected_sellout"] else None
+            }
+            for category, trend in history.trends.items()
+        },
+        "previous_matches": [
+            dict(match, kickoff=match["kickoff"].isoformat()) for match in history.previous_matches
+        ]
+    }
@@ -1,5 +1,6 @@
 from PIL import Image, ImageDraw, ImageFont
 import os
+from clubs.club_logos_mapping import find_opponent
 
 
 class ImageCreator:
@@ -25,29 +26,28 @@ class ImageCreator:
 
     def find_opponent_logo(self, opponent: str, image_map: dict):
         """Determine the opponent logo and title based on the first line of text."""
-        for keywords, (image_name, opponent_name) in image_map.items():
-            if any(keyword in opponent.lower() for keyword in keywords):
-                return image_name, opponent_name
-        return None, None
+        return find_opponent(opponent, image_map)
 
-    def adjust_font_size(self, draw, text: str, font, image_width: int):
-        """Adjust font size to ensure the text fits within the specified width."""
-        text_width, _ = draw.textsize(text, font=font)
-        while text_width > image_width and font.size > 10:
+    def adjust_font_size(self, draw, text: str, font, image_width: int, image_height: int):
+        """Adjust font size to ensure the text fits within the specified width and height."""
+        text_width, text_height = draw.textsize(text, font=font)
+        while (text_width > image_width or text_height > image_height) and font.size > 10:
             font = ImageFont.truetype(self.font_path, font.size - 5)
-            text_width, _ = draw.textsize(text, font=font)
+            text_width, text_height = draw.textsize(text, font=font)
         return font
 
-    def create_image(self, text: str, image_map: dict, league: str):
+    def create_image(self, text: str, image_map: dict, league: str, opponent: tuple = None):
+        """Create the card. A pre-resolved (logo, name) opponent skips looking it up from the text."""
         background = self.load_image(self.background_path)
         hometeam_logo = self.load_image(self.hometeam_logo_path)
         if not background or not hometeam_logo:
             print("Couldn't load club logo and/or background.")
             return None
 
-        first_line = text.split('\n')[0]
-        opponent = first_line.split('-')[1]
-        opponent_logo_name, opponent_name = self.find_opponent_logo(opponent, image_map)
+        if opponent is None:
+            first_line = text.split('\n')[0]
+            opponent = self.find_opponent_logo(first_line.split('-')[1], image_map)
+        opponent_logo_name, opponent_name = opponent
         opponent_found = True
         if not opponent_logo_name:
             print("Couldn't find opposing team in image_map.")
@@ -68,7 +68,7 @@ class ImageCreator:
 
         draw = ImageDraw.Draw(background)
         font = ImageFont.truetype(self.font_path, 100)
-        font = self.adjust_font_size(draw, text, font, background.width)
+        font = self.adjust_font_size(draw, text, font, background.width, background.height - self.TEXT_START_Y)
         text_width, _ = draw.textsize(text, font=font)
         text_position = ((background.width - text_width) / 2, self.TEXT_START_Y)
         draw.text(text_position, text, font=font, fill="white")
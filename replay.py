@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+from datetime import datetime
+import argparse
+import gzip
+import json
+import requests
+from typing import Dict, Optional, Any
+from event_time import now, localize
+
+ARCHIVE_TIME_FORMAT = "%Y-%m-%d_%H-%M-%S"
+
+_recording: Optional[Dict[str, Any]] = None
+_replaying: Optional[Dict[str, Any]] = None
+event_copies = 1
+
+
+def start_recording() -> None:
+    """Starts capturing every response returned by fetch_url."""
+    global _recording
+    _recording = {"recorded_at": now().strftime(ARCHIVE_TIME_FORMAT), "responses": {}}
+
+
+def record_response(url: str, response: requests.Response) -> None:
+    """Stores a live response in the current recording, if one is active."""
+    if _recording is None:
+        return
+    _recording["responses"][url] = {
+        "status": response.status_code,
+        "encoding": response.encoding,
+        # Latin-1 maps every byte to one character, so the body survives the round trip through JSON untouched
+        "content": response.content.decode("latin-1")
+    }
+
+
+def save_recording(archive_path: str) -> None:
+    """
+    Writes the current recording to a gzip-compressed JSON archive and stops recording.
+    Parameters:
+        archive_path (str): Where to write the archive.
+    """
+    global _recording
+    if _recording is None:
+        print("Nothing has been recorded.")
+        return
+    with gzip.open(archive_path, "wt", encoding="utf-8") as archive:
+        json.dump(_recording, archive)
+    print(f"Recorded {len(_recording['responses'])} responses to {archive_path}")
+    _recording = None
+
+
+def load_replay(archive_path: str, copies: int = 1) -> None:
+    """
+    Loads an archive so fetch_url serves its responses instead of going to the network.
+    Parameters:
+        archive_path (str): The archive written by save_recording.
+        copies (int): How many times each scraped event is repeated, to load test with more events.
+    """
+    global _replaying, event_copies
+    with gzip.open(archive_path, "rt", encoding="utf-8") as archive:
+        _replaying = json.load(archive)
+    event_copies = max(1, copies)
+    print(f"Replaying {len(_replaying['responses'])} responses from {archive_path}")
+
+
+def stop_replay() -> None:
+    """Goes back to fetching live data."""
+    global _replaying, event_copies
+    _replaying = None
+    event_copies = 1
+
+
+def is_replaying() -> bool:
+    return _replaying is not None
+
+
+def get_replay_time() -> Optional[datetime]:
+    """Returns the time the replayed archive was recorded, so replays produce the same output every time."""
+    if _replaying is None:
+        return None
+    return localize(datetime.strptime(_replaying["recorded_at"], ARCHIVE_TIME_FORMAT))
+
+
+def get_replayed_response(url: str) -> Optional[requests.Response]:
+    """
+    Builds a response for the URL from the loaded archive.
+    Returns:
+        requests.Response | None: The recorded response, or None if the URL wasn't recorded.
+    """
+    recorded = _replaying["responses"].get(url)
+    if recorded is None:
+        return None
+    response = requests.Response()
+    response.url = url
+    response.status_code = recorded["status"]
+    response.encoding = recorded["encoding"]
+    response._content = recorded["content"].encode("latin-1")
+    return response
+
+
+def run_replay(archive_path: str, club: str, clubs: int = 1, events: int = 1) -> None:
+    """
+    Runs a club's whole pipeline offline from an archive, without posting anything.
+    Every simulated club saves its matches and cards into its own folder below matches/replay.
+    Parameters:
+        archive_path (str): The archive written by save_recording.
+        club (str): Which club's pipeline to run.
+        clubs (int): How many clubs to simulate.
+        events (int): How many times each event is repeated per club.
+    """
+    import scrape_tools
+    run_club = get_run_function(club)
+    default_folder = scrape_tools.MATCHES_FOLDER
+    load_replay(archive_path, events)
+    try:
+        for number in range(clubs):
+            scrape_tools.MATCHES_FOLDER = f"matches/replay/club{number}"
+            run_club("all", False, False, dry_run=True)
+    finally:
+        scrape_tools.MATCHES_FOLDER = default_folder
+        stop_replay()
+
+
+def run_recording(archive_path: str, club: str) -> None:
+    """Runs a club's pipeline against the live site and records every response, without posting anything."""
+    run_club = get_run_function(club)
+    start_recording()
+    run_club("all", False, False, dry_run=True)
+    save_recording(archive_path)
+
+
+def get_run_function(club: str):
+    if club == "rosenborg":
+        from clubs.rosenborg.rosenborg import run_rosenborg
+        return run_rosenborg
+    from clubs.brann.brann import run_brann
+    return run_brann
+
+
+if __name__ == "__main__":
+    # This file runs as __main__ here, while scrape_tools imports it as replay.
+    # Go through the imported module so the replay state is set where fetch_url reads it.
+    import replay
+
+    parser = argparse.ArgumentParser(description="Record or replay the HTTP traffic of a scraping run.")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("archive", help="Path to the archive, e.g. brann.json.gz")
+    parser.add_argument("--club", choices=["brann", "rosenborg"], default="brann")
+    parser.add_argument("--clubs", type=int, default=1, help="Number of clubs to simulate when replaying")
+    parser.add_argument("--events", type=int, default=1, help="Copies of each event when replaying")
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        replay.run_recording(args.archive, args.club)
+    else:
+        replay.run_replay(args.archive, args.club, args.clubs, args.events)
@@ -1,17 +1,24 @@
-from datetime import datetime
 import re
-import pytz
 import requests
 import json
 import os
+import atexit
+from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 from bs4 import BeautifulSoup
+from history import record_snapshot, get_event_history
+from forecast import get_forecast
+import replay
+from event_time import now, parse_event_time
+from seat_index import get_seat_index
 from typing import List, Dict, Tuple, Set, Optional, Any
 
 SAVE_PATH = os.path.dirname(os.path.abspath(__file__)) + "/"
+MATCHES_FOLDER = "matches"
 
 session = requests.Session()
+_pending_snapshots: List[Tuple[str, str, Any]] = []
 
 
 def fetch_url(url: str) -> Optional[requests.Response]:
@@ -22,9 +29,15 @@ def fetch_url(url: str) -> Optional[requests.Response]:
     Returns:
         requests.Response | None: The server's response to the request.
     """
+    if replay.is_replaying():
+        response = replay.get_replayed_response(url)
+        if response is None:
+            print(f"An error occurred while fetching {url}: Not found in replay archive")
+        return response
     try:
         response = session.get(url)
         response.raise_for_status()
+        replay.record_response(url, response)
         return response
     except requests.exceptions.RequestException as e:
         print(f"An error occurred while fetching {url}: {e}")
@@ -78,6 +91,10 @@ def get_upcoming_events(next_or_all: str, homepage_url: str, ignore_list: Set[st
         if next_or_all.lower() == "next":
             break
 
+    if replay.event_copies > 1:  # Load testing from a replay archive
+        event_list = [dict(event, title=f"{event['title']} #{copy}") if copy else event
+                      for copy in range(replay.event_copies) for event in event_list]
+
     events = len(event_list)
     print(f"Done! Added a total of {events} events.")
     return event_list
@@ -108,7 +125,7 @@ def get_nested_link(url: str, event_title: str) -> Optional[str]:
 
 def get_ticket_info(event_url: str, event_title: str) -> List[Dict[str, Any]]:
     """
-    Retrieves and processes ticket information from a given event URL.
+    Retrieves and processes ticket information from a given event URL, covering every ticket type.
     Parameters:
         event_url (str): URL to the ticket information JSON.
         event_title (str): Title of the event, used for logging purposes.
@@ -126,13 +143,17 @@ def get_ticket_info(event_url: str, event_title: str) -> List[Dict[str, Any]]:
         print(f"Failed to fetch or parse JSON from {json_url}: {e}")
         return []
 
-    sections_data = next((item for item in json_data["item_types"] if item["title"] == "Voksen"), json_data["item_types"][0])
-    is_voksen = sections_data["title"] == "Voksen" if sections_data else False
-
-    sections = [
-        {"section_id": section["id"], "has_available_tickets": section["has_available_tickets"] if is_voksen else False}
-        for section in sections_data["sections"]
-    ]
+    # Every ticket type (adult, child, member, VIP...) lists the sections it can be bought in.
+    # A section shared by several types is still only fetched once, then attributed to each of them.
+    sections_by_id = {}
+    for item_type in json_data["item_types"]:
+        for section in item_type.get("sections", []):
+            entry = sections_by_id.setdefault(section["id"], {"section_id": section["id"],
+                                                              "has_available_tickets": False,
+                                                              "item_types": {}})
+            entry["item_types"][item_type["title"]] = section["has_available_tickets"]
+            entry["has_available_tickets"] = entry["has_available_tickets"] or section["has_available_tickets"]
+    sections = list(sections_by_id.values())
 
     results = []
     if sections:
@@ -156,6 +177,7 @@ def get_section_tickets(section: Dict[str, Any], event_url: str, progressbar: tq
     """
     section_id = section['section_id']  # This expects a dictionary with a 'section_id' key
     visibility = section['has_available_tickets']
+    item_types = section.get('item_types', {})
 
     json_url = event_url + "sections/" + str(section_id) + ".json"
     try:
@@ -172,16 +194,22 @@ def get_section_tickets(section: Dict[str, Any], event_url: str, progressbar: tq
         available_seats = 0
         locked_seats = 0
         phantom_seats = 0
-        available_seats_object = None
+        free_block_row, free_block_size = None, 0
+        fill_rate, row_stats = 0.0, {}
+        standing = True
+        standing_available = json_data["seating_arrangements"].get("available_amount")
     else:
-        seats = [seat for seat in json_data["seating_arrangements"]["seats"]]
-        sold_seats = len([seat for seat in seats if seat["status"] == "sold"])
-        available_seats_object = [seat for seat in seats if seat["status"] == "available"]
-        available_seats = len(available_seats_object)
-        locked_seats = len([seat for seat in seats if seat["status"] == "locked"])
-        phantom_seats = len([seat for seat in seats if float(seat["x"]) <= 0 and seat["status"] == "available"])
-        available_seats -= phantom_seats
+        seat_index = get_seat_index(event_url, section_id, json_data["seating_arrangements"]["seats"])
+        counts = seat_index.get_counts()
+        sold_seats = counts["sold_seats"]
+        available_seats = counts["available_seats"]
+        locked_seats = counts["locked_seats"]
+        phantom_seats = counts["phantom_seats"]
+        free_block_row, free_block_size = seat_index.get_largest_free_block()
+        fill_rate, row_stats = seat_index.get_fill_rate(), seat_index.get_row_stats()
         section_total -= phantom_seats
+        standing = False
+        standing_available = None
     progressbar.update(1)
     return {
         "section_name": section_name,
@@ -191,32 +219,105 @@ def get_section_tickets(section: Dict[str, Any], event_url: str, progressbar: tq
         "available_seats": available_seats,
         "locked_seats": locked_seats,
         "phantom_seats": phantom_seats,
-        # "seats": available_seats_object,
+        "largest_free_block": free_block_size,
+        "largest_free_block_row": free_block_row,
+        "fill_rate": fill_rate,
+        "row_stats": row_stats,
+        "standing": standing,
+        "standing_available": standing_available,
+        "item_types": item_types,
         "visible": visibility
     }
 
 
 def save_new_json(event_title: str, data: Any) -> str:
     """
-    Saves the provided data into a JSON file, naming it based on the current timestamp.
+    Writes the provided data to a temporary JSON file, naming it based on the current timestamp.
+    The data is on disk as soon as it is scraped, but it only gets its final name in flush_snapshots,
+    after it has been fsynced, so a crash never leaves an empty or truncated results file behind.
     Parameters:
         event_title (str): Title of the event, used for directory naming.
         data (Any): Data to be saved into the JSON file.
             It can be a single dictionary or a list of dictionaries.
     Returns:
-        str: Directory path where the file was saved.
+        str: Directory path where the file will be saved.
     """
     dir_path, dir_path_simple = get_directory_path(event_title)
     time_now = get_time_formatted("computer")
     filename = f"results_{time_now}.json"
+    temp_path = os.path.join(dir_path, f".{filename}.tmp")
 
-    file_path = os.path.join(dir_path, filename)
-    with open(file_path, "w") as json_file:
-        json.dump(data, json_file)
-        print(f"Json file saved to {dir_path_simple}")
+    try:
+        with open(temp_path, "w") as json_file:
+            json.dump(data, json_file)
+    except OSError as e:
+        print(f"Failed to save {filename} to {dir_path_simple}: {e}")
+        remove_temp_file(temp_path)
+        return dir_path
+
+    _pending_snapshots.append((dir_path, filename, data))
+    print(f"Json file written for {dir_path_simple}")
     return dir_path
 
 
+def remove_temp_file(temp_path: str) -> None:
+    """Removes a temporary snapshot file that couldn't be saved, ignoring it if it's already gone."""
+    try:
+        os.remove(temp_path)
+    except OSError:
+        pass
+
+
+def flush_snapshots() -> int:
+    """
+    Moves every snapshot written since the last call into place in one batch.
+    Each temporary file is fsynced and only then renamed to its final name, and every directory
+    is fsynced once per batch so the renames survive a crash too.
+    Returns:
+        int: The number of snapshots that were saved.
+    """
+    synced = []
+    while _pending_snapshots:
+        dir_path, filename, data = _pending_snapshots.pop(0)
+        temp_path = os.path.join(dir_path, f".{filename}.tmp")
+        try:
+            with open(temp_path, "rb") as json_file:
+                os.fsync(json_file.fileno())
+            synced.append((dir_path, filename, data))
+        except OSError as e:
+            print(f"Failed to sync {filename} in {dir_path}: {e}")
+            remove_temp_file(temp_path)
+
+    written = []
+    for dir_path, filename, data in synced:
+        temp_path = os.path.join(dir_path, f".{filename}.tmp")
+        try:
+            os.replace(temp_path, os.path.join(dir_path, filename))
+        except OSError as e:
+            print(f"Failed to move {filename} into place in {dir_path}: {e}")
+            remove_temp_file(temp_path)
+            continue
+        written.append(dir_path)
+        record_snapshot(dir_path, filename, data)
+
+    for dir_path in set(written):
+        try:
+            dir_fd = os.open(dir_path, os.O_RDONLY)
+        except OSError:
+            continue  # Directories can't be opened for fsync on every platform
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    if written:
+        print(f"Saved {len(written)} json files")
+    return len(written)
+
+
+atexit.register(flush_snapshots)
+
+
 def get_directory_path(event_name: str) -> Tuple[str, str]:
     """
     Generates a valid directory path for storing files related to an event, creating the directory if it does not exist.
@@ -226,10 +327,32 @@ def get_directory_path(event_name: str) -> Tuple[str, str]:
         Tuple[str, str]: A tuple containing the full directory path and a simplified path.
     """
     valid_dir_name = re.sub(r'[<>:"/\\|?*]', '', event_name).replace(' ', '').replace('\n', '')
-    dir_path = os.path.join(SAVE_PATH, f"matches/{valid_dir_name}")
+    dir_path = os.path.join(SAVE_PATH, f"{MATCHES_FOLDER}/{valid_dir_name}")
     if not os.path.exists(dir_path):
         os.makedirs(dir_path)
-    return dir_path, f"matches/{valid_dir_name}"
+    return dir_path, f"{MATCHES_FOLDER}/{valid_dir_name}"
+
+
+def get_image_path(club: str, pic_number: int) -> str:
+    """
+    Generates the path for an event card, relative to the project root.
+    Replays save their cards next to the replayed matches instead of overwriting the club's real ones.
+    Parameters:
+        club (str): The club's folder name.
+        pic_number (int): The number of the card in this run.
+    Returns:
+        str: The path to save the image to.
+    """
+    if not replay.is_replaying():
+        return f"clubs/{club}/picture{pic_number}.png"
+    folder = f"{MATCHES_FOLDER}/pictures"
+    os.makedirs(os.path.join(SAVE_PATH, folder), exist_ok=True)
+    return f"{folder}/{club}_picture{pic_number}.png"
+
+
+def current_time() -> datetime:
+    """Returns the time every stage of a run should use: the recording time while replaying, otherwise now."""
+    return replay.get_replay_time() or now()
 
 
 def get_time_formatted(computer_or_human: str) -> str:
@@ -240,8 +363,7 @@ def get_time_formatted(computer_or_human: str) -> str:
     Returns:
         str: The formatted time string.
     """
-    norway_timezone = pytz.timezone("Europe/Oslo")
-    current_datetime = datetime.now(norway_timezone)
+    current_datetime = current_time()
 
     if computer_or_human.lower() == "computer":
         return current_datetime.strftime("%Y-%m-%d_%H-%M-%S")
@@ -269,25 +391,33 @@ def get_latest_file(dir_path: str) -> Tuple[Optional[Dict[str, Any]], Optional[D
     Returns:
         Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]: A tuple containing the latest and prior latest JSON file data, or None if not available.
     """
-    files = os.listdir(dir_path)
+    files = [file for file in os.listdir(dir_path) if file.startswith("results_") and file.endswith(".json")]
     sorted_files = sorted(files, key=lambda x: os.path.getmtime(os.path.join(dir_path, x)), reverse=True)
-    latest_file_path = os.path.join(dir_path, sorted_files[0])
-    with open(latest_file_path, "r") as json_file:
-        latest_file = json.load(json_file)
 
-    if len(sorted_files) > 1:
-        prior_file_path = os.path.join(dir_path, sorted_files[1])
-        with open(prior_file_path, "r") as json_file:
-            prior_file = json.load(json_file)
-        return latest_file, prior_file
-    return latest_file, None
+    loaded_files = []
+    for file in sorted_files:
+        try:
+            with open(os.path.join(dir_path, file), "r") as json_file:
+                loaded_files.append(json.load(json_file))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Skipping unreadable file {file}: {e}")
+            continue
+        if len(loaded_files) == 2:
+            break
+
+    if not loaded_files:
+        return None, None
+    if len(loaded_files) > 1:
+        return loaded_files[0], loaded_files[1]
+    return loaded_files[0], None
 
 
-def create_string(dir_path: str) -> str:
+def create_string(dir_path: str, include_forecast: bool = False) -> str:
     """
     Generates a summary string representing the comparison between the latest and prior event data.
     Parameters:
         dir_path (str): The directory path where the event files are stored.
+        include_forecast (bool): Whether to add the predicted final attendance and sellout time.
     Returns:
         str: A formatted string summarizing the event data changes.
     """
@@ -324,10 +454,43 @@ def create_string(dir_path: str) -> str:
         else:
             summary += f"{category.ljust(10)} {f'{sold_seats}/{total_capacity}'.ljust(12)} {percentage_sold:.1f}%\n"
 
+    if include_forecast:
+        summary += create_forecast_string(dir_path)
+
     summary += f"\n\nUpdated: {time}\n"
     return summary
 
 
+def create_forecast_string(dir_path: str) -> str:
+    """
+    Generates the forecast and trend lines for the total of an event.
+    Parameters:
+        dir_path (str): The directory path where the event files are stored.
+    Returns:
+        str: The formatted lines, or an empty string if there isn't enough data for any of them.
+    """
+    summary = ""
+    history = get_event_history(dir_path)
+    velocity = history.trends.get("TOTALT", {}).get("velocity")
+    if velocity is not None:
+        summary += f"{'TEMPO'.ljust(10)} {f'{velocity:+.1f}/t'.ljust(12)}\n"
+
+    if history.previous_matches:
+        previous = history.previous_matches[-1]  # The most recent earlier match
+        previous_sold = f"{previous['sold_seats']}/{previous['section_amount']}"
+        summary += f"{'FORRIGE'.ljust(10)} {previous_sold.ljust(12)}\n"
+
+    forecast = get_forecast(dir_path).get("TOTALT")
+    if forecast and forecast["section_amount"] > 0:
+        predicted_sold = forecast["predicted_sold"]
+        total_capacity = forecast["section_amount"]
+        percentage = predicted_sold / total_capacity * 100
+        summary += f"{'PROGNOSE'.ljust(10)} {f'{predicted_sold}/{total_capacity}'.ljust(12)} {percentage:.1f}%\n"
+        if forecast["sellout"]:
+            summary += f"{'UTSOLGT'.ljust(10)} {forecast['sellout'].strftime('%H:%M %d/%m/%Y')}\n"
+    return f"\n{summary}" if summary else ""
+
+
 def add_custom_games(custom_games, event_list):
     """
     Adds custom games to an event list if they are not duplicates and have not occurred.
@@ -339,10 +502,8 @@ def add_custom_games(custom_games, event_list):
     """
     for game in custom_games:
         if all(game['link'] != event['link'] for event in event_list):
-            game_time_str = game['time'].split('\n')[0]
-            game_date_time = datetime.strptime(game_time_str, "%d.%m.%Y %H:%M")
-            current_date_time = datetime.now()
-            if game_date_time < current_date_time:
+            game_date_time, _ = parse_event_time(game['time'])
+            if game_date_time < current_time():
                 print('Skipping - Match already played (' + game['title'] + ')')
                 continue
             print('Adding custom game (' + game['title'] + ')')
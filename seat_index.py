@@ -0,0 +1,121 @@
+from collections import OrderedDict
+import threading
+import numpy as np
+from typing import List, Dict, Tuple, Optional, Any
+
+STATUS_CODES = {"available": 0, "sold": 1, "locked": 2}
+OTHER_STATUS = 3
+MAX_SEAT_INDEXES = 2000  # Sections kept in memory, enough for every section of several upcoming events
+
+
+class SectionSeatIndex:
+    """
+    Array-backed index over the seats in one section.
+    The geometry (x, y, row) is built once and reused across polls; each poll only refreshes the status array.
+    A section counts as one block, since TicketCo sections are the stadium's blocks.
+    """
+
+    def __init__(self, seats: List[Dict[str, Any]]):
+        self.signature = get_signature(seats)
+        self.x = np.array([float(seat["x"]) for seat in seats])
+        self.y = np.array([float(seat.get("y", 0)) for seat in seats])
+        self.row_labels, self.row_codes = np.unique([str(seat.get("row", "")) for seat in seats], return_inverse=True)
+        self.phantom = self.x <= 0
+        # Real seats ordered by row and then position, used to find neighbouring free seats
+        real_seats = np.flatnonzero(~self.phantom)
+        self.row_order = real_seats[np.lexsort((self.x[real_seats], self.row_codes[real_seats]))]
+        self.status = np.full(len(seats), OTHER_STATUS, dtype=np.int8)
+        self.update_status(seats)
+
+    def update_status(self, seats: List[Dict[str, Any]]) -> None:
+        """Refreshes the seat statuses from a new poll of the same section."""
+        self.status = np.fromiter((STATUS_CODES.get(seat["status"], OTHER_STATUS) for seat in seats),
+                                  dtype=np.int8, count=len(seats))
+
+    def get_counts(self) -> Dict[str, int]:
+        """Returns the sold, available, locked and phantom seat counts. Phantom seats aren't counted as available."""
+        available = self.status == STATUS_CODES["available"]
+        phantom_seats = int(np.count_nonzero(available & self.phantom))
+        return {
+            "sold_seats": int(np.count_nonzero(self.status == STATUS_CODES["sold"])),
+            "available_seats": int(np.count_nonzero(available)) - phantom_seats,
+            "locked_seats": int(np.count_nonzero(self.status == STATUS_CODES["locked"])),
+            "phantom_seats": phantom_seats
+        }
+
+    def get_row_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the number of seats, sold seats and fill rate for each row, ignoring phantom seats."""
+        real = ~self.phantom
+        size = len(self.row_labels)
+        seats = np.bincount(self.row_codes[real], minlength=size)
+        sold = np.bincount(self.row_codes[real & (self.status == STATUS_CODES["sold"])], minlength=size)
+        fill_rate = np.divide(sold, seats, out=np.zeros(size), where=seats > 0)
+        return {
+            str(label): {"seats": int(seats[code]), "sold_seats": int(sold[code]), "fill_rate": float(fill_rate[code])}
+            for code, label in enumerate(self.row_labels) if seats[code] > 0
+        }
+
+    def get_fill_rate(self) -> float:
+        """Returns the share of real seats in the block that are sold."""
+        real = ~self.phantom
+        seats = np.count_nonzero(real)
+        return float(np.count_nonzero(real & (self.status == STATUS_CODES["sold"])) / seats) if seats else 0.0
+
+    def get_largest_free_block(self) -> Tuple[Optional[str], int]:
+        """
+        Finds the longest run of neighbouring available seats in a single row.
+        Returns:
+            Tuple[Optional[str], int]: The row label and the number of seats, or (None, 0) if nothing is available.
+        """
+        if len(self.row_order) == 0:
+            return None, 0
+        rows = self.row_codes[self.row_order]
+        free = self.status[self.row_order] == STATUS_CODES["available"]
+        starts = np.concatenate(([0], np.flatnonzero((rows[1:] != rows[:-1]) | (free[1:] != free[:-1])) + 1))
+        lengths = np.diff(np.append(starts, len(rows)))
+        lengths[~free[starts]] = 0
+        best = int(np.argmax(lengths))
+        if lengths[best] == 0:
+            return None, 0
+        return str(self.row_labels[rows[starts[best]]]), int(lengths[best])
+
+
+_seat_indexes: "OrderedDict[Tuple[str, Any], SectionSeatIndex]" = OrderedDict()
+_seat_indexes_lock = threading.Lock()
+
+
+def get_signature(seats: List[Dict[str, Any]]) -> Tuple:
+    """
+    Fingerprint of the seat order, used to notice when a section's seat map has changed between polls.
+    The statuses are stored by position, so any added, removed or reordered seat must rebuild the index.
+    Seats without an id are identified by their position and row instead.
+    """
+    return tuple(seat.get("id", (seat.get("x"), seat.get("y"), seat.get("row"))) for seat in seats)
+
+
+def get_seat_index(event_url: str, section_id: Any, seats: List[Dict[str, Any]]) -> SectionSeatIndex:
+    """
+    Returns the cached index for a section, refreshing its statuses, or builds a new one if the seat map changed.
+    The cache is kept in least recently used order and bounded by MAX_SEAT_INDEXES, so sections of events
+    that have been played drop out instead of piling up in a long-running poller.
+    Parameters:
+        event_url (str): Base URL of the event.
+        section_id (Any): The TicketCo section id.
+        seats (List[Dict[str, Any]]): The seats from the section JSON.
+    Returns:
+        SectionSeatIndex: The up-to-date index for the section.
+    """
+    key = (event_url, section_id)
+    with _seat_indexes_lock:  # Sections are counted on several threads at once
+        index = _seat_indexes.get(key)
+    if index is None or index.signature != get_signature(seats):
+        index = SectionSeatIndex(seats)
+    else:
+        index.update_status(seats)
+
+    with _seat_indexes_lock:
+        _seat_indexes[key] = index
+        _seat_indexes.move_to_end(key)
+        while len(_seat_indexes) > MAX_SEAT_INDEXES:
+            _seat_indexes.popitem(last=False)
+    return index